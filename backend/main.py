@@ -1,36 +1,62 @@
 from fastapi import FastAPI,Depends
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime
-from zoneinfo import ZoneInfo
+from fastapi.responses import ORJSONResponse
+from datetime import datetime, timezone
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from time import monotonic
+import asyncio
+import logging
+import queue
 
 from scipher.config import settings
-from scipher.models.database import init_db
+from scipher.models.database import init_db, warm_pool
 from scipher.dependencies import get_db
-from scipher.api.middleware import RequestLoggingMiddleware, ErrorHandlingMiddleware
+from scipher.core.document_processor import document_processor
+from scipher.core.summarizer import document_summarizer
+from scipher.api.middleware import ScipherMiddleware
 from scipher.api.routes import upload, processing, content
 from scipher.models.schemas import HealthResponse
 
+logging.basicConfig(level=logging.INFO if bool(settings.DEBUG) else logging.WARNING)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown events"""
-    await init_db()
-    await settings.initialize()
-    yield
+    # Hand log records to a background thread so handler I/O never blocks the event loop
+    root_logger = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *root_logger.handlers, respect_handler_level=True)
+    root_logger.handlers = [QueueHandler(log_queue)]
+    listener.start()
+
+    # Everything after the listener starts sits in the try, so a failed startup still restores logging
+    try:
+        await init_db()
+        await warm_pool()
+        await settings.initialize()
+        if settings.summarizer_warmup_enabled:
+            # Not awaited: startup proceeds, and summary requests get a 503 until the model is loaded
+            document_summarizer.start_warmup(asyncio.get_running_loop())
+        yield
+    finally:
+        document_processor.shutdown()
+        listener.stop()
+        root_logger.handlers = list(listener.handlers)
 
 app = FastAPI(
     title=settings.APP_NAME,
     description="Scipher",
     version=settings.APP_VERSION,
     debug=bool(settings.DEBUG),
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-app.add_middleware(RequestLoggingMiddleware)
-app.add_middleware(ErrorHandlingMiddleware)
+app.add_middleware(ScipherMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[str(origin) for origin in settings.CORS_ORIGINS],
@@ -54,19 +80,42 @@ async def root():
         "redoc": "/redoc"
     }
 
+# Last database probe result, shared so concurrent health checks collapse to one query
+_health_lock = asyncio.Lock()
+_health_checked_at = 0.0
+_health_db_status = "disconnected"
+
+async def get_database_status(db: AsyncSession) -> str:
+    """Return the database status, re-probing at most once per HEALTH_CHECK_TTL"""
+    global _health_checked_at, _health_db_status
+    if monotonic() - _health_checked_at < settings.HEALTH_CHECK_TTL:
+        return _health_db_status
+    
+    async with _health_lock:
+        if monotonic() - _health_checked_at < settings.HEALTH_CHECK_TTL:
+            return _health_db_status
+        try:
+            await db.execute(text("SELECT 1"))
+            _health_db_status = "connected"
+        except OperationalError:
+            _health_db_status = "disconnected"
+        _health_checked_at = monotonic()
+    
+    return _health_db_status
+
+@app.get("/api/health/live")
+async def liveness_check():
+    """Liveness probe that never touches the database"""
+    return {"status": "alive"}
+
 @app.get("/api/health", response_model=HealthResponse)
 async def health_check(db: AsyncSession = Depends(get_db)):
     """Health check endpoint for monitoring"""
-    db_status = "disconnected"
-    try:
-        await db.execute(text("SELECT 1"))
-        db_status = "connected"
-    except OperationalError:
-        db_status = "disconnected"
+    db_status = await get_database_status(db)
     
     return HealthResponse(
         status="healthy" if db_status == "connected" else "unhealthy",
-        timestamp=datetime.now(ZoneInfo("UTC")),
+        timestamp=datetime.now(timezone.utc),
         database=db_status,
         version=settings.APP_VERSION
     )
@@ -77,6 +126,13 @@ if __name__ == "__main__":
         "main:app",
         host=str(settings.HOST),
         port=int(settings.PORT),
+        loop="uvloop",
+        http="httptools",
         reload=bool(settings.DEBUG),
-        workers=1 if bool(settings.DEBUG) else 4
+        workers=settings.web_worker_count,
+        log_level="info" if bool(settings.DEBUG) else "warning",
+        access_log=bool(settings.DEBUG),
+        proxy_headers=False,
+        server_header=False,
+        date_header=False
     )
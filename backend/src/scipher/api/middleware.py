@@ -1,64 +1,104 @@
-from fastapi import Request, Response
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-import asyncio
+from fastapi.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from time import monotonic
+from typing import Optional
 import logging
-from typing import Callable
+import orjson
 
 from scipher.core.exceptions import ScipherBaseException
-from scipher.models.schemas import ErrorResponse
+from scipher.core.validator import validator
 
-# Configure logging (only if not already configured)
-if not logging.getLogger(__name__).hasHandlers():
-    logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Logs all incoming requests and their processing time"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = asyncio.get_event_loop().time()
-        
+# The generic 500 body never changes, so serialize it once
+_INTERNAL_ERROR_BYTES = orjson.dumps({
+    "success": False,
+    "error": "InternalServerError",
+    "detail": "An unexpected error occurred"
+})
+
+# FastAPI spools the whole multipart body to disk before the route runs, so its size is checked here
+_UPLOAD_PATH = "/api/upload"
+
+def _content_length(scope: Scope) -> Optional[str]:
+    """Raw Content-Length header of a request, if sent"""
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            return value.decode("latin-1")
+    return None
+
+class ScipherMiddleware:
+    """
+    Single ASGI middleware for request logging, processing time, upload size and error handling
+
+    Folding these into one layer keeps each request to a single send wrapper
+    instead of one per concern.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = monotonic()
+        method = scope["method"]
+        path = scope["path"]
+        log_enabled = logger.isEnabledFor(logging.INFO)
+        response_started = False
+
         # Log request
-        logger.info(f"Request: {request.method} {request.url.path}")
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate processing time
-        process_time = asyncio.get_event_loop().time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-        
-        # Log response
-        logger.info(
-            f"Response: {request.method} {request.url.path} "
-            f"Status: {response.status_code} Time: {process_time:.3f}s"
-        )
-        
-        return response
+        if log_enabled:
+            logger.info("Request: %s %s", method, path)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+                # Calculate processing time
+                process_time = monotonic() - start_time
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time", f"{process_time:.6f}".encode()))
+                message["headers"] = headers
+
+                # Log response
+                if log_enabled:
+                    logger.info(
+                        "Response: %s %s Status: %d Time: %.3fs",
+                        method, path, message["status"], process_time
+                    )
+            await send(message)
+
+        # Process request
         try:
-            return await call_next(request)
+            if method == "POST" and path == _UPLOAD_PATH:
+                # Reject oversized uploads before the body is read
+                validator.validate_content_length(_content_length(scope))
+            await self.app(scope, receive, send_wrapper)
         except ScipherBaseException as e:
-            logger.error(f"ScipherException: {e.detail}")
-            return JSONResponse(
+            logger.error("ScipherException: %s", e.detail)
+            if response_started:
+                raise
+            response = Response(
+                content=orjson.dumps({
+                    "success": False,
+                    "error": e.__class__.__name__,
+                    "detail": e.detail
+                }),
                 status_code=e.status_code,
-                content=ErrorResponse(
-                    success=False,
-                    error=e.__class__.__name__,
-                    detail=e.detail
-                ).dict()
+                media_type="application/json"
             )
+            await response(scope, receive, send_wrapper)
         except Exception as e:
-            logger.error(f"Unhandled exception: {str(e)}", exc_info=True)
-            return JSONResponse(
+            logger.error("Unhandled exception: %s", e, exc_info=True)
+            if response_started:
+                raise
+            response = Response(
+                content=_INTERNAL_ERROR_BYTES,
                 status_code=500,
-                content=ErrorResponse(
-                    success=False,
-                    error="InternalServerError",
-                    detail="An unexpected error occurred"
-                ).dict()
+                media_type="application/json"
             )
+            await response(scope, receive, send_wrapper)
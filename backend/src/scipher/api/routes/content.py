@@ -1,24 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import Response, ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import select, delete, bindparam
+from sqlalchemy.orm import selectinload, raiseload
+from typing import Dict, List, Optional, Tuple
 import logging
-import json
 from uuid import UUID
+import aiofiles.os
 
-from scipher.dependencies import get_db, get_document_processor
-from scipher.models.database import Document, Section
+from scipher.dependencies import get_db, get_document_processor, get_response_cache, get_summarizer
+from scipher.models.database import Document, Section, ProcessingJob
 from scipher.models.schemas import ProcessedContent, DeleteResponse, SectionSchema, ProcessingStatus, DocumentSummaryResponse
-from scipher.core.document_processor import DocumentProcessor
-from scipher.core.exceptions import DocumentNotFoundException, ProcessingException
+from scipher.core.document_processor import DocumentProcessor, LAZY_SECTION_TYPE, SECTION_TYPES
+from scipher.core.summarizer import DocumentSummarizer
+from scipher.core.exceptions import DocumentNotFoundException, ProcessingException, NotModifiedException
 from scipher.config import settings
-from pydantic import BaseModel
+from scipher.utils.cache import ResponseCache
+from scipher.utils.response_utils import response_formatter
+from pydantic import BaseModel, TypeAdapter
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["content"])
 
+_COMPLETED = ProcessingStatus.COMPLETED.value
+
+# Statements are built once so SQLAlchemy's compiled cache is hit on every request
+_DOC_BY_ID = select(Document).where(Document.id == bindparam("doc_id"))
+# Anything else touched on the content path would be a hidden lazy load, so make it raise
+_DOC_WITH_SECTIONS_BY_ID = _DOC_BY_ID.options(selectinload(Document.sections), raiseload("*"))
+# Only the columns _document_etag needs, for revalidating cached bodies
+_DOC_ETAG_BY_ID = select(Document.id, Document.upload_date, Document.status).where(Document.id == bindparam("doc_id"))
+_SECTIONS_BY_DOC = select(Section).where(Section.document_id == bindparam("doc_id")).order_by(Section.order)
+
+# Set-based deletes; children go first so databases created before ON DELETE CASCADE still succeed
+_DELETE_SECTIONS = delete(Section).where(Section.document_id == bindparam("doc_id"))
+_DELETE_JOBS = delete(ProcessingJob).where(ProcessingJob.document_id == bindparam("doc_id"))
+_DELETE_DOC = delete(Document).where(Document.id == bindparam("doc_id")).returning(Document.file_path)
+
+# One compiled validator for whole section lists instead of per-row from_orm
+_SECTIONS_ADAPTER = TypeAdapter(List[SectionSchema])
+
 # New Pydantic model for get_document_text response
 class TextResponse(BaseModel):
     id: UUID
@@ -26,9 +48,89 @@ class TextResponse(BaseModel):
     text: str
     status: ProcessingStatus
 
+def _document_etag(doc: Document) -> str:
+    """Weak ETag for a document's derived content; it only changes with status or re-upload"""
+    return f'W/"{doc.id}-{int(doc.upload_date.timestamp())}-{doc.status}"'
+
+def _opaque_tag(tag: str) -> str:
+    """Entity tag without its weak prefix; If-None-Match uses weak comparison"""
+    return tag[2:] if tag.startswith("W/") else tag
+
+def _check_not_modified(request: Request, etag: str, headers: Optional[Dict[str, str]] = None) -> None:
+    """
+    Raise a 304 when the client already holds the current representation
+    
+    Args:
+        request: Incoming request
+        etag: Current entity tag
+        headers: Extra headers to send with the 304 (optional)
+        
+    Raises:
+        NotModifiedException: If If-None-Match is "*" or lists the current tag
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return
+    
+    tags = {_opaque_tag(tag.strip()) for tag in if_none_match.split(",")}
+    if "*" in tags or _opaque_tag(etag) in tags:
+        raise NotModifiedException(etag, headers)
+
+async def _get_cached_body(
+    db: AsyncSession,
+    cache: ResponseCache,
+    doc_id: str,
+    key
+) -> Optional[Tuple[str, bytes]]:
+    """
+    Get a cached (etag, body) pair, provided the document row still matches it
+    
+    The cache is per worker process, so deletes and reprocessing handled by another
+    worker are only visible in the database; a lookup of the ETag columns catches them.
+    
+    Args:
+        db: Database session
+        cache: Response cache
+        doc_id: Document ID
+        key: Response key within the document
+        
+    Returns:
+        Cached (etag, body) or None if missing or stale
+    """
+    cached = cache.get(doc_id, key)
+    if cached is None:
+        return None
+    row = (await db.execute(_DOC_ETAG_BY_ID, {"doc_id": doc_id})).first()
+    if row is None or _document_etag(row) != cached[0]:
+        cache.invalidate(doc_id)
+        return None
+    return cached
+
+def _has_lazy_sections(sections) -> bool:
+    """Whether a document's sections were deferred to first read at ingestion"""
+    return any(section.section_type == LAZY_SECTION_TYPE for section in sections)
+
+def _unlink_if_exists(path: Path) -> bool:
+    """Remove a file, logging rather than raising on failure; meant to run in a worker thread"""
+    try:
+        path.unlink()
+        logger.info(f"Deleted file: {path}")
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning(f"Could not delete file {path}: {e}")
+        return False
+
+def _remove_document_files(paths: List[Path]) -> None:
+    """Remove a deleted document's files once its rows are committed"""
+    for path in paths:
+        _unlink_if_exists(path)
+
 @router.get("/document/{doc_id}", response_model=ProcessedContent)
 async def get_document_content(
-    doc_id: str,
+    doc_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     processor: DocumentProcessor = Depends(get_document_processor)
 ):
@@ -39,42 +141,52 @@ async def get_document_content(
     
     Returns extracted text, sections, and metadata
     """
-    try:
-        doc_uuid = UUID(doc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
+    doc_id_str = str(doc_id)
     
-    stmt = select(Document).filter_by(id=str(doc_uuid))
-    doc = (await db.scalars(stmt)).first()
+    doc = (await db.scalars(_DOC_WITH_SECTIONS_BY_ID, {"doc_id": doc_id_str})).first()
     
     if not doc:
-        raise DocumentNotFoundException(doc_id)
+        raise DocumentNotFoundException(doc_id_str)
     
-    if doc.status != ProcessingStatus.COMPLETED.value:
+    if doc.status != _COMPLETED:
         raise HTTPException(
             status_code=400, 
             detail=f"Document not ready. Current status: {doc.status}"
         )
     
-    sections_stmt = select(Section).filter_by(document_id=str(doc_uuid)).order_by(Section.order)
-    sections = (await db.scalars(sections_stmt)).all()
+    etag = _document_etag(doc)
+    _check_not_modified(request, etag)
     
-    return ProcessedContent(
-        id=doc.id,
+    sections = doc.sections
+    if _has_lazy_sections(sections):
+        sections = await processor.load_lazy_sections(doc_id_str)
+    
+    # Fields come straight from the ORM row, so skip re-validating them here
+    content = ProcessedContent.model_construct(
+        id=UUID(doc.id),
         filename=doc.filename,
         original_filename=doc.original_filename,
         text=doc.extracted_text or "",
-        sections=[SectionSchema.from_orm(section) for section in sections],
-        metadata=json.loads(doc.metadata_json) if doc.metadata_json else {},
+        sections=_SECTIONS_ADAPTER.validate_python(sections, from_attributes=True),
+        metadata=doc.metadata_json or {},
         file_size=doc.file_size,
         upload_date=doc.upload_date
     )
+    
+    # Dump once and hand the dict to orjson, bypassing jsonable_encoder
+    return ORJSONResponse(
+        content=content.model_dump(mode="json"),
+        headers={"ETag": etag}
+    )
 
 @router.get("/document/{doc_id}/sections", response_model=List[SectionSchema])
 async def get_document_sections(
-    doc_id: str,
+    doc_id: UUID,
+    request: Request,
     section_type: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    processor: DocumentProcessor = Depends(get_document_processor),
+    cache: ResponseCache = Depends(get_response_cache)
 ):
     """
     Retrieve document sections
@@ -82,35 +194,54 @@ async def get_document_sections(
     - **doc_id**: Document ID
     - **section_type**: Filter by section type (optional)
     
-    Returns list of document sections
+    Returns list of document sections; `id` is null for sections of large
+    documents, which are parsed from the markdown on read rather than stored
     """
-    try:
-        doc_uuid = UUID(doc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
+    doc_id_str = str(doc_id)
+    # Arbitrary filter values would each add an entry, so only known types are cached
+    cache_key = ("sections", section_type) if section_type is None or section_type in SECTION_TYPES else None
+    
+    cached = await _get_cached_body(db, cache, doc_id_str, cache_key) if cache_key else None
+    if cached is not None:
+        etag, body = cached
+        _check_not_modified(request, etag)
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
     
     # Check if document exists
-    stmt = select(Document).filter_by(id=str(doc_uuid))
-    doc = (await db.scalars(stmt)).first()
+    doc = (await db.scalars(_DOC_BY_ID, {"doc_id": doc_id_str})).first()
     
     if not doc:
-        raise DocumentNotFoundException(doc_id)
+        raise DocumentNotFoundException(doc_id_str)
+    
+    etag = _document_etag(doc)
+    _check_not_modified(request, etag)
     
-    # Build query
-    query = select(Section).filter_by(document_id=str(doc_uuid))
+    # Build query; the lazy placeholder is always fetched so deferred documents are recognised
+    query = _SECTIONS_BY_DOC
     if section_type:
-        query = query.filter_by(section_type=section_type)
+        query = query.where(Section.section_type.in_((section_type, LAZY_SECTION_TYPE)))
+    
+    sections = (await db.scalars(query, {"doc_id": doc_id_str})).all()
     
-    query = query.order_by(Section.order)
-    sections = (await db.scalars(query)).all()
+    if _has_lazy_sections(sections):
+        sections = await processor.load_lazy_sections(doc_id_str)
+        if section_type:
+            sections = [row for row in sections if row["section_type"] == section_type]
     
-    return [SectionSchema.from_orm(section) for section in sections]
+    # Validate and serialize with the same adapter, bypassing jsonable_encoder
+    body = _SECTIONS_ADAPTER.dump_json(_SECTIONS_ADAPTER.validate_python(sections, from_attributes=True))
+    
+    # Sections only change when the document is (re)processed, so cache once complete
+    if cache_key and doc.status == _COMPLETED:
+        cache.set(doc_id_str, cache_key, (etag, body), len(body))
+    
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @router.get("/document/{doc_id}/markdown")
 async def get_document_markdown(
-    doc_id: str,
-    db: AsyncSession = Depends(get_db),
-    processor: DocumentProcessor = Depends(get_document_processor)
+    doc_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Retrieve markdown file directly
@@ -119,49 +250,62 @@ async def get_document_markdown(
     
     Returns markdown file with proper content-type headers
     """
-    try:
-        doc_uuid = UUID(doc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
+    doc_id_str = str(doc_id)
+    md_file_path = settings.PROCESSED_DATA_DIR / f"{doc_id_str}.md"
     
-    stmt = select(Document).filter_by(id=str(doc_uuid))
-    doc = (await db.scalars(stmt)).first()
+    # Not cached: a cached row would have to be revalidated with the same lookup anyway
+    doc = (await db.scalars(_DOC_BY_ID, {"doc_id": doc_id_str})).first()
     
     if not doc:
-        raise DocumentNotFoundException(doc_id)
+        raise DocumentNotFoundException(doc_id_str)
     
-    if doc.status != ProcessingStatus.COMPLETED.value:
+    if doc.status != _COMPLETED:
         raise HTTPException(
             status_code=400,
             detail=f"Document not ready. Current status: {doc.status}"
         )
     
-    # Load markdown from file
-    markdown_content = processor.load_markdown_file(doc_id)
+    original_filename = doc.original_filename
     
-    if not markdown_content:
+    # Stat on every request: FileResponse trusts the stat it is given
+    try:
+        stat_result = await aiofiles.os.stat(md_file_path)
+    except FileNotFoundError:
+        stat_result = None
+    
+    if not stat_result or not stat_result.st_size:
         raise HTTPException(
             status_code=404,
             detail="Markdown file not found"
         )
     
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    headers = {
+        "Cache-Control": "public, max-age=3600",
+        "ETag": etag
+    }
+    
+    _check_not_modified(request, etag, headers)
+    
     # Return as file response with proper headers
-    md_file_path = settings.PROCESSED_DATA_DIR / f"{doc_id}.md"
-    return FileResponse(
-        path=str(md_file_path),
+    return response_formatter.file_response(
+        path=md_file_path,
         media_type="text/markdown",
-        filename=f"{doc.original_filename}.md",
+        filename=f"{original_filename}.md",
+        stat_result=stat_result,
         headers={
-            "Cache-Control": "public, max-age=3600",
-            "Content-Disposition": f'inline; filename="{doc.original_filename}.md"'
+            **headers,
+            "Content-Disposition": f'inline; filename="{original_filename}.md"'
         }
     )
 
 @router.get("/document/{doc_id}/text", response_model=TextResponse)
 async def get_document_text(
-    doc_id: str,
+    doc_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db),
-    processor: DocumentProcessor = Depends(get_document_processor)
+    processor: DocumentProcessor = Depends(get_document_processor),
+    cache: ResponseCache = Depends(get_response_cache)
 ):
     """
     Retrieve raw extracted text from document
@@ -170,62 +314,71 @@ async def get_document_text(
     
     Returns plain text content (reads from MD file for efficiency)
     """
-    try:
-        doc_uuid = UUID(doc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
+    doc_id_str = str(doc_id)
+    
+    cached = await _get_cached_body(db, cache, doc_id_str, "text")
+    if cached is not None:
+        etag, body = cached
+        _check_not_modified(request, etag)
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
     
-    stmt = select(Document).filter_by(id=str(doc_uuid))
-    doc = (await db.scalars(stmt)).first()
+    doc = (await db.scalars(_DOC_BY_ID, {"doc_id": doc_id_str})).first()
     
     if not doc:
-        raise DocumentNotFoundException(doc_id)
+        raise DocumentNotFoundException(doc_id_str)
     
-    if doc.status != ProcessingStatus.COMPLETED.value:
+    if doc.status != _COMPLETED:
         raise HTTPException(
             status_code=400,
             detail=f"Document not ready. Current status: {doc.status}"
         )
     
+    etag = _document_etag(doc)
+    _check_not_modified(request, etag)
+    
     # Load from MD file (more efficient than DB)
-    markdown_content = processor.load_markdown_file(doc_id)
+    markdown_content = await processor.load_markdown_file(doc_id_str)
     
     # Fallback to DB if MD file doesn't exist (for backward compatibility)
     text_content = markdown_content if markdown_content else (doc.extracted_text or "No text available")
     
-    return TextResponse(
-        id=doc.id,
-        filename=doc.original_filename,
-        text=text_content,
-        status=ProcessingStatus(doc.status)
+    # Serialize the (potentially multi-MB) text once with orjson and cache the bytes
+    text_response = ORJSONResponse(
+        content=TextResponse(
+            id=doc.id,
+            filename=doc.original_filename,
+            text=text_content,
+            status=ProcessingStatus(doc.status)
+        ).model_dump(mode="json"),
+        headers={"ETag": etag}
     )
+    cache.set(doc_id_str, "text", (etag, text_response.body), len(text_response.body))
+    
+    return text_response
 
 @router.get("/document/{doc_id}/summary", response_model=DocumentSummaryResponse)
 async def get_document_summary(
-    doc_id: str,
+    doc_id: UUID,
     db: AsyncSession = Depends(get_db),
-    processor: DocumentProcessor = Depends(get_document_processor)
+    processor: DocumentProcessor = Depends(get_document_processor),
+    summarizer: DocumentSummarizer = Depends(get_summarizer)
 ):
     """Generate difficulty-based summaries for a processed document."""
-    try:
-        doc_uuid = UUID(doc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
+    doc_id_str = str(doc_id)
 
-    stmt = select(Document).filter_by(id=str(doc_uuid))
-    doc = (await db.scalars(stmt)).first()
+    doc = (await db.scalars(_DOC_BY_ID, {"doc_id": doc_id_str})).first()
 
     if not doc:
-        raise DocumentNotFoundException(doc_id)
+        raise DocumentNotFoundException(doc_id_str)
 
-    if doc.status != ProcessingStatus.COMPLETED.value:
+    if doc.status != _COMPLETED:
         raise HTTPException(
             status_code=400,
             detail=f"Document not ready. Current status: {doc.status}"
         )
 
     try:
-        summary_result = await processor.summarize_document(doc_id)
+        summary_result = await processor.summarize_document(doc_id_str, summarizer)
     except ProcessingException as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
@@ -240,8 +393,10 @@ async def get_document_summary(
 
 @router.delete("/document/{doc_id}", response_model=DeleteResponse)
 async def delete_document(
-    doc_id: str,
-    db: AsyncSession = Depends(get_db)
+    doc_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache)
 ):
     """
     Delete a document and all associated data
@@ -250,51 +405,31 @@ async def delete_document(
     
     Deletes document, files, sections, and processing jobs
     """
-    try:
-        doc_uuid = UUID(doc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
+    doc_id_str = str(doc_id)
+    params = {"doc_id": doc_id_str}
     
-    stmt = select(Document).filter_by(id=str(doc_uuid))
-    doc = (await db.scalars(stmt)).first()
+    # Delete rows in one transaction; RETURNING gives the upload path without a prior SELECT
+    await db.execute(_DELETE_SECTIONS, params)
+    await db.execute(_DELETE_JOBS, params)
+    file_path = (await db.execute(_DELETE_DOC, params)).scalar_one_or_none()
     
-    if not doc:
-        raise DocumentNotFoundException(doc_id)
+    if file_path is None:
+        await db.rollback()
+        raise DocumentNotFoundException(doc_id_str)
     
-    # Delete physical file
-    try:
-        file_path = Path(doc.file_path)
-        if file_path.exists():
-            file_path.unlink()
-            logger.info(f"Deleted file: {file_path}")
-    except Exception as e:
-        logger.warning(f"Could not delete file {doc.file_path}: {e}")
-    
-    # Delete processed data files (JSON for backward compatibility, MD for current)
-    try:
-        processed_file = settings.PROCESSED_DATA_DIR / f"{doc_id}.json"
-        if processed_file.exists():
-            processed_file.unlink()
-            logger.info(f"Deleted processed data: {processed_file}")
-    except Exception as e:
-        logger.warning(f"Could not delete processed data for {doc_id}: {e}")
-    
-    # Delete markdown file
-    try:
-        md_file = settings.PROCESSED_DATA_DIR / f"{doc_id}.md"
-        if md_file.exists():
-            md_file.unlink()
-            logger.info(f"Deleted markdown: {md_file}")
-    except Exception as e:
-        logger.warning(f"Could not delete markdown for {doc_id}: {e}")
-    
-    # Delete database record (cascade will handle sections and jobs)
-    await db.delete(doc)
     await db.commit()
+    cache.invalidate(doc_id_str)
+    
+    # Only remove files after the commit, so a failed delete never leaves a row without its files
+    background_tasks.add_task(_remove_document_files, [
+        Path(file_path),
+        settings.PROCESSED_DATA_DIR / f"{doc_id_str}.json",  # JSON for backward compatibility
+        settings.PROCESSED_DATA_DIR / f"{doc_id_str}.md"
+    ])
     
-    logger.info(f"Successfully deleted document {doc_id}")
+    logger.info(f"Successfully deleted document {doc_id_str}")
     
     return DeleteResponse(
         message="Document deleted successfully",
-        id=doc_uuid  # Use UUID
+        id=doc_id  # Use UUID
     )
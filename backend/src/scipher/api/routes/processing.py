@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+from sqlalchemy.orm import load_only
 from typing import List, Optional
 from uuid import UUID
 import logging
+from pydantic import TypeAdapter
 
 from scipher.dependencies import get_db
 from scipher.models.database import Document, ProcessingJob
@@ -13,22 +16,41 @@ from scipher.core.exceptions import DocumentNotFoundException
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["processing"])
 
+# Columns needed by DocumentResponse; skips the extracted_text and metadata payloads
+_DOCUMENT_SUMMARY_COLUMNS = load_only(
+    Document.id,
+    Document.filename,
+    Document.original_filename,
+    Document.upload_date,
+    Document.status,
+    Document.error_message,
+    Document.file_size
+)
+
+# Built once: validates ORM rows in bulk and serializes the page straight to bytes
+_DOCUMENTS_ADAPTER = TypeAdapter(List[DocumentResponse])
+_LIST_ADAPTER = TypeAdapter(DocumentListResponse)
+
+# Fixed messages per status; FAILED is formatted with the error message instead
+_STATUS_MESSAGES = {
+    ProcessingStatus.COMPLETED.value: "Document processing completed successfully",
+    ProcessingStatus.PROCESSING.value: "Document is currently being processed",
+    ProcessingStatus.UPLOADED.value: "Document uploaded and queued for processing"
+}
+_FAILED = ProcessingStatus.FAILED.value
+
 def get_status_message(doc) -> str:
     """Helper function to generate status message based on document status"""
-    if doc.status == ProcessingStatus.COMPLETED.value:
-        return "Document processing completed successfully"
-    elif doc.status == ProcessingStatus.PROCESSING.value:
-        return "Document is currently being processed"
-    elif doc.status == ProcessingStatus.FAILED.value:
+    message = _STATUS_MESSAGES.get(doc.status)
+    if message:
+        return message
+    if doc.status == _FAILED:
         return f"Document processing failed: {doc.error_message or 'Unknown error'}"
-    elif doc.status == ProcessingStatus.UPLOADED.value:
-        return "Document uploaded and queued for processing"
-    else:
-        return f"Document status: {doc.status}"
+    return f"Document status: {doc.status}"
 
 @router.get("/status/{doc_id}", response_model=StatusResponse)
 async def get_processing_status(
-    doc_id: str,
+    doc_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -38,19 +60,16 @@ async def get_processing_status(
     
     Returns current processing status and any error messages
     """
-    try:
-        doc_uuid = UUID(doc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
+    doc_id_str = str(doc_id)
     
-    stmt = select(Document).filter_by(id=str(doc_uuid))
+    stmt = select(Document).options(load_only(Document.status, Document.error_message)).filter_by(id=doc_id_str)
     doc = (await db.scalars(stmt)).first()
     
     if not doc:
-        raise DocumentNotFoundException(doc_id)
+        raise DocumentNotFoundException(doc_id_str)
     
     return StatusResponse(
-        id=doc_uuid,
+        id=doc_id,
         status=ProcessingStatus(doc.status),
         message=get_status_message(doc),
         error_message=doc.error_message
@@ -58,7 +77,7 @@ async def get_processing_status(
 
 @router.get("/jobs/{doc_id}", response_model=List[ProcessingJobSchema])
 async def get_processing_jobs(
-    doc_id: str,
+    doc_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -68,18 +87,15 @@ async def get_processing_jobs(
     
     Returns list of processing jobs with their status
     """
-    try:
-        doc_uuid = UUID(doc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
+    doc_id_str = str(doc_id)
     
-    stmt = select(Document).filter_by(id=str(doc_uuid))
+    stmt = select(Document).filter_by(id=doc_id_str)
     doc = (await db.scalars(stmt)).first()
     
     if not doc:
-        raise DocumentNotFoundException(doc_id)
+        raise DocumentNotFoundException(doc_id_str)
     
-    stmt = select(ProcessingJob).filter_by(document_id=str(doc_uuid))
+    stmt = select(ProcessingJob).filter_by(document_id=doc_id_str)
     jobs = (await db.scalars(stmt)).all()
     
     return [ProcessingJobSchema.from_orm(job) for job in jobs]
@@ -100,23 +116,31 @@ async def list_documents(
     
     Returns paginated list of documents with metadata
     """
-    stmt = select(Document)
+    # Page and total count in one round trip via a window function
+    stmt = select(Document, func.count().over().label("total")).options(_DOCUMENT_SUMMARY_COLUMNS)
     if status:
-        stmt = stmt.filter_by(status=status.value)
-    
-    # Count total for pagination
-    count_stmt = select(func.count()).select_from(Document)
-    if status:
-        count_stmt = count_stmt.filter_by(status=status.value)
-    total = (await db.scalar(count_stmt)) or 0
+        stmt = stmt.where(Document.status == status.value)
     
     # Apply pagination
-    stmt = stmt.offset(skip).limit(limit)
-    documents = (await db.scalars(stmt)).all()
+    stmt = stmt.order_by(Document.upload_date.desc()).offset(skip).limit(limit)
+    rows = (await db.execute(stmt)).all()
+    
+    documents = [row.Document for row in rows]
+    if rows:
+        total = rows[0].total
+    elif skip:
+        # Page is past the end, so the window count is unavailable
+        count_stmt = select(func.count()).select_from(Document)
+        if status:
+            count_stmt = count_stmt.where(Document.status == status.value)
+        total = (await db.scalar(count_stmt)) or 0
+    else:
+        total = 0
     
-    return DocumentListResponse(
-        documents=[DocumentResponse.from_orm(doc) for doc in documents],
+    payload = DocumentListResponse.model_construct(
+        documents=_DOCUMENTS_ADAPTER.validate_python(documents, from_attributes=True),
         total=total,
         skip=skip,
         limit=limit
     )
+    return Response(content=_LIST_ADAPTER.dump_json(payload), media_type="application/json")
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, UploadFile, File, Depends, BackgroundTasks
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import insert
 import asyncio
 
-from scipher.dependencies import get_db, get_validator, get_file_manager, get_document_processor
+from scipher.dependencies import get_db, get_session_factory, get_validator, get_file_manager, get_document_processor
 from scipher.core.validator import DocumentValidator
 from scipher.core.document_processor import DocumentProcessor
 from scipher.utils.file_utils import FileManager
@@ -17,6 +18,7 @@ async def upload_document(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
     validator: DocumentValidator = Depends(get_validator),
     file_manager: FileManager = Depends(get_file_manager),
     processor: DocumentProcessor = Depends(get_document_processor)
@@ -46,31 +48,30 @@ async def upload_document(
     # Generate unique filename
     doc_id, safe_filename = file_manager.generate_unique_filename(file.filename)
     
-    # Save file
-    file_path = file_manager.save_upload_file(file, safe_filename)
+    # Save file off the event loop; the sync path can sendfile spooled uploads in-kernel
+    file_path = await asyncio.to_thread(file_manager.save_upload_file, file, safe_filename)
     
     # Create database record
     try:
-        db_doc = Document(
+        # INSERT ... RETURNING hands back the row, so no refresh round trip is needed
+        stmt = insert(Document).values(
             id=doc_id,
             filename=safe_filename,  # Sanitized filename
             original_filename=safe_original_name,  # Original filename
             file_path=str(file_path),
             file_size=file_size,
             status=ProcessingStatus.UPLOADED.value
-        )
+        ).returning(Document)
         
-        db.add(db_doc)
+        db_doc = (await db.execute(stmt)).scalar_one()
         await db.commit()
-        await db.refresh(db_doc)
     except Exception as e:
         # Cleanup file if database fails
-        file_manager.delete_file(file_path)
+        await file_manager.delete_file_async(file_path)
         raise DatabaseException(f"Failed to create document record: {str(e)}")
     
-    # Queue background processing (wrap async to sync for BackgroundTasks)
-    background_tasks.add_task(
-        lambda: asyncio.run(processor.process_document(doc_id, str(file_path)))
-    )
+    # Queue background processing on the app's event loop (Docling work runs in an executor).
+    # The task opens its own session; the request session is released with the response.
+    background_tasks.add_task(processor.process_document, doc_id, str(file_path), session_factory)
     
     return db_doc
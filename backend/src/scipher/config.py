@@ -1,8 +1,15 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
-from typing import Set
+from typing import Optional, Set, Tuple
+from functools import lru_cache
 import asyncio
 
+@lru_cache(maxsize=None)
+def _ensure_dirs(directories: Tuple[Path, ...]) -> None:
+    """Create the app's working directories; cached so repeat initialization skips the mkdirs"""
+    for directory in directories:
+        directory.mkdir(exist_ok=True)
+
 class Settings(BaseSettings):
     APP_NAME: str = "Scipher API"
     APP_VERSION: str = "1.0.0"
@@ -10,17 +17,37 @@ class Settings(BaseSettings):
     
     HOST: str = "0.0.0.0"
     PORT: int = 8080
+    WEB_WORKERS: int = 4  # uvicorn worker processes outside DEBUG
     
     DATABASE_URL: str = "sqlite+aiosqlite:///./scipher.db"
     DB_ECHO: bool = False
+    # Pool budgets are per host and split across web workers (see db_pool_size), so the
+    # defaults allow at most 50 connections however many workers run
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 30  # headroom for bursts of status polling during uploads
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_POOL_WARMUP: int = 5  # connections opened at startup
+    DB_QUERY_CACHE_SIZE: int = 2000  # compiled statement cache entries
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 512  # per-connection, asyncpg only
+    DB_INSERTMANYVALUES_PAGE_SIZE: int = 1000  # rows per batched multi-row INSERT
+    DB_COPY_MIN_ROWS: int = 100  # section batches this large use COPY on asyncpg
     
     UPLOAD_DIR: Path = Path("uploads")
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB per read/copy when writing uploads to disk
     ALLOWED_EXTENSIONS: Set[str] = {".pdf"}
     
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:3001"]
     
     PROCESSING_TIMEOUT: int = 180
+    PDF_WORKERS: int = 0  # PDF conversion processes per web worker; 0 splits os.cpu_count() across WEB_WORKERS
+    SUMMARIZER_WARMUP: Optional[bool] = None  # load the summarization model at startup; None only with one web worker, as each loads its own copy
+    SECTIONS_EAGER_MAX_CHARS: int = 200_000  # larger documents parse sections on first read
+    HEALTH_CHECK_TTL: float = 5.0  # seconds a database probe result is reused
+    RESPONSE_CACHE_TTL: float = 300.0  # seconds; 0 disables the document response cache
+    RESPONSE_CACHE_MAX_DOCUMENTS: int = 256
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # per web worker; least recently used documents are evicted first
     
     PROCESSED_DATA_DIR: Path = Path("processed")
     TEMP_DIR: Path = Path("temp")
@@ -30,6 +57,28 @@ class Settings(BaseSettings):
         case_sensitive=True
     )
     
+    @property
+    def web_worker_count(self) -> int:
+        """uvicorn worker processes main.py starts"""
+        return 1 if self.DEBUG else self.WEB_WORKERS
+    
+    @property
+    def db_pool_size(self) -> int:
+        """Connection pool size for one web worker's engine"""
+        return max(1, self.DB_POOL_SIZE // self.web_worker_count)
+    
+    @property
+    def db_max_overflow(self) -> int:
+        """Pool overflow for one web worker's engine"""
+        return self.DB_MAX_OVERFLOW // self.web_worker_count
+    
+    @property
+    def summarizer_warmup_enabled(self) -> bool:
+        """Whether to warm the summarizer at startup, resolving the SUMMARIZER_WARMUP default"""
+        if self.SUMMARIZER_WARMUP is None:
+            return self.web_worker_count == 1
+        return self.SUMMARIZER_WARMUP
+    
     async def initialize(self):
         """Asynchronously initialize settings and create directories"""
         # Validate critical settings
@@ -39,12 +88,15 @@ class Settings(BaseSettings):
             raise ValueError("ALLOWED_EXTENSIONS cannot be empty")
         if self.PORT <= 0 or self.PORT > 65535:
             raise ValueError("PORT must be between 1 and 65535")
+        if self.WEB_WORKERS <= 0:
+            raise ValueError("WEB_WORKERS must be positive")
         
-        # Create directories asynchronously
+        # Create directories asynchronously, once per distinct set of paths
         try:
-            loop = asyncio.get_event_loop()
-            for directory in [self.UPLOAD_DIR, self.PROCESSED_DATA_DIR, self.TEMP_DIR]:
-                await loop.run_in_executor(None, lambda: directory.mkdir(exist_ok=True))
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, _ensure_dirs, (self.UPLOAD_DIR, self.PROCESSED_DATA_DIR, self.TEMP_DIR)
+            )
         except Exception as e:
             raise ValueError(f"Failed to create required directories: {e}")
 
@@ -10,7 +10,9 @@ from .exceptions import (
     UnsupportedFileTypeException,
     DocumentNotReadyException,
     FileOperationException,
-    DatabaseException
+    DatabaseException,
+    ServiceUnavailableException,
+    NotModifiedException
 )
 
 __all__ = [
@@ -26,5 +28,7 @@ __all__ = [
     "UnsupportedFileTypeException",
     "DocumentNotReadyException",
     "FileOperationException",
-    "DatabaseException"
+    "DatabaseException",
+    "ServiceUnavailableException",
+    "NotModifiedException"
 ]
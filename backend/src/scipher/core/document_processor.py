@@ -1,13 +1,15 @@
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from datetime import datetime
-from zoneinfo import ZoneInfo
-import json
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
+from datetime import datetime, timezone
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
 import asyncio
+import os
+import re
 
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from docling.document_converter import DocumentConverter
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import bindparam, insert, update
 
 from scipher.models.database import async_session, Document, Section, ProcessingJob
 from scipher.models.schemas import ProcessingStatus, JobType
@@ -15,9 +17,36 @@ from scipher.core.exceptions import ProcessingException
 from scipher.config import settings
 import logging
 from scipher.core.summarizer import document_summarizer, DocumentSummarizer, SummaryResult
+from scipher.utils.cache import response_cache
+from scipher.pdf_worker import convert_and_export
 
 logger = logging.getLogger(__name__)
 
+# Markdown title ("# ") and section ("## ") header lines
+_HEADER_RE = re.compile(r"(?m)^[ \t]*(#{1,2}) (.+)$")
+
+# Built once so every document hits the same compiled statement
+_MARK_PROCESSING = (
+    update(Document)
+    .where(Document.id == bindparam("doc_id"))
+    .values(status=ProcessingStatus.PROCESSING.value)
+    .returning(Document.id)
+)
+
+# Sections keep only a preview in the DB; full content lives in the markdown file
+SECTION_PREVIEW_CHARS = 200
+
+# Placeholder section stored for documents whose sections are parsed on read
+LAZY_SECTION_TYPE = "lazy"
+
+# Section types produced by iter_sections
+SECTION_TYPES = frozenset(("title", "section", "body"))
+
+def _read_markdown(path: str) -> str:
+    """Read a processed markdown file"""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
 class DocumentProcessor:
     """
     Orchestrates document processing pipeline
@@ -25,41 +54,62 @@ class DocumentProcessor:
     """
     
     def __init__(self):
-        self.processed_dir = settings.PROCESSED_DATA_DIR
-        self.processed_dir.mkdir(exist_ok=True)
-        self.converter = DocumentConverter()
+        self.processed_dir = settings.PROCESSED_DATA_DIR  # created by settings.initialize() at startup
+        # Docling conversion is CPU heavy and partly GIL-bound, so it runs in worker processes.
+        # Spawned rather than forked: the parent already has event loop and torch threads.
+        # Every web worker has its own pool and each process loads its own Docling models,
+        # so by default the cores are split between web workers rather than given to each.
+        self._pdf_pool = ProcessPoolExecutor(
+            max_workers=settings.PDF_WORKERS or max(1, (os.cpu_count() or 1) // settings.WEB_WORKERS),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        # Small dedicated pool so file I/O doesn't queue behind Docling on the default executor
+        self._io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="scipher-io")
         self.summarizer: DocumentSummarizer = document_summarizer
+        # Parsed lazy sections per markdown file version, so reads don't re-parse large documents
+        self._lazy_section_rows = lru_cache(maxsize=32)(self._parse_lazy_sections)
+    
+    def shutdown(self):
+        """Stop the PDF worker processes and the I/O pool"""
+        self._pdf_pool.shutdown(wait=False, cancel_futures=True)
+        self._io_executor.shutdown(wait=False)
     
-    async def process_document(self, doc_id: str, file_path: str):
+    async def process_document(
+        self,
+        doc_id: str,
+        file_path: str,
+        session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+    ):
         """
         Main processing pipeline for documents
         
         Args:
             doc_id: Document ID
             file_path: Path to uploaded file
+            session_factory: Factory for the task's own session (defaults to async_session)
         """
-        async with async_session() as db:
-            job = None
+        session_factory = session_factory or async_session
+        async with session_factory() as db:
+            found = False
+            job_id = None
             
             try:
-                # Get document (async query)
-                stmt = select(Document).filter_by(id=doc_id)
-                doc = (await db.scalars(stmt)).first()
-                if not doc:
+                # Mark the document as processing and open its job in one transaction
+                result = await db.execute(_MARK_PROCESSING, {"doc_id": doc_id})
+                if result.first() is None:
                     return
+                found = True
                 
-                # Update status
-                doc.status = ProcessingStatus.PROCESSING.value
-                await db.commit()
-                
-                # Create processing job
-                job = ProcessingJob(
-                    document_id=doc_id,
-                    job_type=JobType.EXTRACTION.value,
-                    status=ProcessingStatus.RUNNING.value,  # Fixed to use ProcessingStatus
-                    started_at=datetime.now(ZoneInfo("UTC"))
+                job_id = await db.scalar(
+                    insert(ProcessingJob)
+                    .values(
+                        document_id=doc_id,
+                        job_type=JobType.EXTRACTION.value,
+                        status=ProcessingStatus.RUNNING.value,
+                        started_at=datetime.now(timezone.utc)
+                    )
+                    .returning(ProcessingJob.id)
                 )
-                db.add(job)
                 await db.commit()
                 
                 logger.info(f"Starting Docling extraction for document {doc_id}")
@@ -72,46 +122,96 @@ class DocumentProcessor:
                 
                 # Save markdown text to file (not in DB for efficiency)
                 markdown_text = extracted_data["text"]
+                n_chars = len(markdown_text)
                 await self.save_markdown_file(doc_id, markdown_text)
                 
-                # Store minimal text in DB (nullable, for fallback/search) - first 1000 chars
-                doc.extracted_text = markdown_text[:1000] if len(markdown_text) > 1000 else markdown_text
-                doc.metadata_json = json.dumps(extracted_data["metadata"])
-                
                 # Parse and save sections with only metadata (preview, not full content)
-                sections = self.parse_sections(extracted_data)
-                for idx, section_data in enumerate(sections):
-                    # Store only preview (first 200 chars) for filtering, not full content
-                    content_preview = section_data["content"][:200] if len(section_data["content"]) > 200 else section_data["content"]
-                    section = Section(
-                        document_id=doc_id,
-                        section_type=section_data["type"],
-                        content=content_preview,  # Only preview, full content in MD file
-                        order=idx
-                    )
-                    db.add(section)
+                # in a single executemany instead of one ORM object per section.
+                # Very large documents get a placeholder and are parsed on first read.
+                if n_chars > settings.SECTIONS_EAGER_MAX_CHARS:
+                    rows = [{
+                        "document_id": doc_id,
+                        "section_type": LAZY_SECTION_TYPE,
+                        "content": "",
+                        "order": 0
+                    }]
+                else:
+                    # One pass from markdown to rows; only previews are ever materialized (full content in MD file)
+                    rows = self.section_rows(doc_id, self.iter_sections(markdown_text, max_chars=SECTION_PREVIEW_CHARS))
+                if rows:
+                    await self._insert_sections(db, rows)
                 
-                # Update document status
-                doc.status = ProcessingStatus.COMPLETED.value
-                job.status = ProcessingStatus.COMPLETED.value
-                job.completed_at = datetime.now(ZoneInfo("UTC"))
-                job.result_data = f"Extracted {len(extracted_data['text'])} characters"
+                # Update document status, storing minimal text in DB (nullable, for fallback/search) - first 1000 chars
+                await db.execute(
+                    update(Document)
+                    .where(Document.id == doc_id)
+                    .values(
+                        status=ProcessingStatus.COMPLETED.value,
+                        extracted_text=markdown_text[:1000],
+                        metadata_json=extracted_data["metadata"]
+                    )
+                )
+                await db.execute(
+                    update(ProcessingJob)
+                    .where(ProcessingJob.id == job_id)
+                    .values(
+                        status=ProcessingStatus.COMPLETED.value,
+                        completed_at=datetime.now(timezone.utc),
+                        result_data=f"Extracted {n_chars} characters"
+                    )
+                )
                 
                 await db.commit()
+                response_cache.invalidate(doc_id)
                 logger.info(f"Successfully processed document {doc_id}")
                 
             except Exception as e:
                 logger.error(f"Processing failed for document {doc_id}: {str(e)}")
-                if doc:
-                    doc.status = ProcessingStatus.FAILED.value
-                    doc.error_message = str(e)
-                if job:
-                    job.status = ProcessingStatus.FAILED.value
-                    job.error_message = str(e)
-                    job.completed_at = datetime.now(ZoneInfo("UTC"))
+                await db.rollback()
+                if found:
+                    await db.execute(
+                        update(Document)
+                        .where(Document.id == doc_id)
+                        .values(status=ProcessingStatus.FAILED.value, error_message=str(e))
+                    )
+                if job_id is not None:
+                    await db.execute(
+                        update(ProcessingJob)
+                        .where(ProcessingJob.id == job_id)
+                        .values(
+                            status=ProcessingStatus.FAILED.value,
+                            error_message=str(e),
+                            completed_at=datetime.now(timezone.utc)
+                        )
+                    )
                 await db.commit()
                 raise ProcessingException(str(e))
     
+    async def _insert_sections(self, db: AsyncSession, rows: List[Dict[str, Any]]):
+        """
+        Insert section rows in the current transaction
+        
+        Large batches on PostgreSQL are streamed with COPY through the raw
+        asyncpg connection; everything else uses a bulk INSERT.
+        
+        Args:
+            db: Session holding the processing transaction
+            rows: Section row dictionaries
+        """
+        if len(rows) >= settings.DB_COPY_MIN_ROWS and db.bind.dialect.driver == "asyncpg":
+            conn = await db.connection()
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                Section.__tablename__,
+                records=[
+                    (row["document_id"], row["section_type"], row["content"], row["order"])
+                    for row in rows
+                ],
+                columns=["document_id", "section_type", "content", "order"]
+            )
+        else:
+            await db.execute(insert(Section), rows)
+    
     async def extract_text(self, file_path: str) -> Dict[str, Any]:
         """
         Extract text from PDF using Docling
@@ -124,31 +224,31 @@ class DocumentProcessor:
         """
         pdf_path = Path(file_path)
         
-        if not pdf_path.exists():
-            raise ProcessingException(f"File not found: {file_path}")
-        
-        if pdf_path.suffix.lower() != '.pdf':
+        if pdf_path.suffix.lower() not in settings.ALLOWED_EXTENSIONS:
             raise ProcessingException(f"Unsupported file type: {pdf_path.suffix}")
         
+        # One stat() both checks existence and provides the size for metadata
+        try:
+            file_size = pdf_path.stat().st_size
+        except FileNotFoundError:
+            raise ProcessingException(f"File not found: {file_path}")
+        
         try:
             logger.info(f"Converting PDF with Docling: {pdf_path.name}")
             
-            # Run conversion in executor (CPU-bound operation)
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                self._convert_pdf_sync,
+            # Convert and export to markdown in the PDF process pool (CPU-bound operation)
+            loop = asyncio.get_running_loop()
+            markdown_text, num_pages = await loop.run_in_executor(
+                self._pdf_pool,
+                convert_and_export,
                 str(pdf_path)
             )
             
-            # Export to markdown for clean text extraction
-            markdown_text = result.document.export_to_markdown()
-            
             # Get document metadata
             metadata = {
-                "pages": result.document.num_pages(),
-                "file_size": pdf_path.stat().st_size,
-                "extraction_date": datetime.now(ZoneInfo("UTC")).isoformat(),
+                "pages": num_pages,
+                "file_size": file_size,
+                "extraction_date": datetime.now(timezone.utc).isoformat(),
                 "converter": "docling",
                 "format": "markdown"
             }
@@ -165,10 +265,6 @@ class DocumentProcessor:
             logger.error(f"Docling extraction failed: {str(e)}")
             raise ProcessingException(f"Text extraction failed: {str(e)}")
     
-    def _convert_pdf_sync(self, file_path: str):
-        """Synchronous PDF conversion helper for executor"""
-        return self.converter.convert(file_path)
-    
     def parse_sections(self, extracted_data: Dict[str, Any]) -> List[Dict[str, str]]:
         """
         Parse document into logical sections
@@ -179,45 +275,102 @@ class DocumentProcessor:
         Returns:
             List of section dictionaries
         """
-        text = extracted_data.get("text", "")
-        
-        # Simple section detection based on markdown headers
-        sections = []
-        current_section = {"type": "body", "content": ""}
+        return [
+            {"type": section_type, "content": content}
+            for section_type, content in self.iter_sections(extracted_data.get("text", ""))
+        ]
+    
+    def iter_sections(self, text: str, max_chars: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Yield logical sections of a markdown document in order
         
-        for line in text.split('\n'):
-            line_stripped = line.strip()
+        Args:
+            text: Markdown text
+            max_chars: Truncate each section's content to this length (optional)
             
-            # Detect headers (markdown format)
-            if line_stripped.startswith('# '):
-                if current_section["content"]:
-                    sections.append(current_section)
-                current_section = {
-                    "type": "title",
-                    "content": line_stripped[2:] + "\n"
-                }
-            elif line_stripped.startswith('## '):
-                if current_section["content"]:
-                    sections.append(current_section)
-                current_section = {
-                    "type": "section",
-                    "content": line_stripped[3:] + "\n"
-                }
-            else:
-                current_section["content"] += line + "\n"
+        Returns:
+            Iterator of (section type, content) tuples
+        """
+        # Simple section detection based on markdown headers: the regex scan
+        # finds header lines and section bodies are sliced between matches.
+        # With max_chars only the preview is sliced, never the full body.
+        def content(header: str, start: int, end: int) -> str:
+            if max_chars is not None:
+                header = header[:max_chars]
+                end = min(end, start + max_chars - len(header))
+            return header + text[start:end]
+        
+        current_type = "body"
+        current_header = ""
+        body_start = 0
+        emitted = False
+        
+        for match in _HEADER_RE.finditer(text):
+            if current_header or body_start < match.start():
+                yield current_type, content(current_header, body_start, match.start())
+                emitted = True
+            current_type = "title" if len(match.group(1)) == 1 else "section"
+            current_header = match.group(2).strip() + "\n"
+            body_start = match.end() + 1  # skip the header's newline
+        
+        # Last section; if no sections were detected the full text is a single body
+        if current_header or body_start < len(text) or not emitted:
+            yield current_type, content(current_header, body_start, len(text))
+    
+    def section_rows(self, doc_id: str, sections: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Build Section rows from parsed sections
         
-        # Add last section
-        if current_section["content"]:
-            sections.append(current_section)
+        Args:
+            doc_id: Document ID
+            sections: (section type, content preview) tuples, e.g. from iter_sections
+            
+        Returns:
+            List of row dictionaries
+        """
+        return [
+            {
+                "document_id": doc_id,
+                "section_type": section_type,
+                "content": preview,
+                "order": idx
+            }
+            for idx, (section_type, preview) in enumerate(sections)
+        ]
+    
+    async def load_lazy_sections(self, doc_id: str) -> List[Dict[str, Any]]:
+        """
+        Parse sections for a document stored with the lazy placeholder
         
-        # If no sections detected, return full text as body
-        if not sections:
-            sections = [{
-                "type": "body",
-                "content": text
-            }]
+        Args:
+            doc_id: Document ID
+            
+        Returns:
+            List of row dictionaries, as section_rows would have stored them
+        """
+        file_path = self.processed_dir / f"{doc_id}.md"
         
-        return sections
+        try:
+            loop = asyncio.get_running_loop()
+            rows = await loop.run_in_executor(self._io_executor, self._load_lazy_sections_sync, doc_id, file_path)
+        except Exception as e:
+            raise ProcessingException(f"Failed to load markdown file: {str(e)}")
+        return list(rows)
+    
+    def _load_lazy_sections_sync(self, doc_id: str, file_path: Path) -> Tuple[Dict[str, Any], ...]:
+        """Synchronous lazy section helper, served from cache while the file is unchanged"""
+        try:
+            stat_result = file_path.stat()
+            return self._lazy_section_rows(doc_id, str(file_path), stat_result.st_mtime_ns, stat_result.st_size)
+        except FileNotFoundError:
+            return ()
+    
+    def _parse_lazy_sections(self, doc_id: str, path: str, mtime_ns: int, size: int) -> Tuple[Dict[str, Any], ...]:
+        """Parse section rows from a markdown file; mtime and size are part of the cache key so rewrites miss"""
+        markdown_text = _read_markdown(path)
+        if not markdown_text:
+            return ()
+        return tuple(self.section_rows(doc_id, self.iter_sections(markdown_text, max_chars=SECTION_PREVIEW_CHARS)))
     
     async def save_markdown_file(self, doc_id: str, markdown_text: str):
         """
@@ -230,9 +383,9 @@ class DocumentProcessor:
         output_path = self.processed_dir / f"{doc_id}.md"
         
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             await loop.run_in_executor(
-                None,
+                self._io_executor,
                 self._save_markdown_sync,
                 output_path,
                 markdown_text
@@ -243,10 +396,16 @@ class DocumentProcessor:
     
     def _save_markdown_sync(self, output_path: Path, markdown_text: str):
         """Synchronous markdown save helper"""
-        with output_path.open("w", encoding="utf-8") as f:
-            f.write(markdown_text)
+        data = memoryview(markdown_text.encode("utf-8"))
+        fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            # os.write may write less than asked, so loop until the buffer is drained
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
     
-    def load_markdown_file(self, doc_id: str) -> Optional[str]:
+    async def load_markdown_file(self, doc_id: str) -> Optional[str]:
         """
         Load markdown file
         
@@ -258,23 +417,28 @@ class DocumentProcessor:
         """
         file_path = self.processed_dir / f"{doc_id}.md"
         
-        if not file_path.exists():
-            return None
-        
         try:
-            with file_path.open("r", encoding="utf-8") as f:
-                return f.read()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._io_executor, self._load_markdown_sync, file_path)
         except Exception as e:
             raise ProcessingException(f"Failed to load markdown file: {str(e)}")
+    
+    def _load_markdown_sync(self, file_path: Path) -> Optional[str]:
+        """Synchronous markdown load helper"""
+        # Not cached here: whole papers per worker add up, and the response cache already holds /text bodies
+        try:
+            return _read_markdown(str(file_path))
+        except FileNotFoundError:
+            return None
 
     async def summarize_document(self, doc_id: str, summarizer: Optional[DocumentSummarizer] = None) -> SummaryResult:
         """Generate summaries for a processed document."""
-        markdown_text = self.load_markdown_file(doc_id)
+        markdown_text = await self.load_markdown_file(doc_id)
         if not markdown_text:
             raise ProcessingException("No processed markdown available for summarization")
 
         summarizer = summarizer or self.summarizer
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         try:
             result = await loop.run_in_executor(None, summarizer.summarize, markdown_text)
         except ValueError as exc:
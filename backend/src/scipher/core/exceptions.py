@@ -1,3 +1,4 @@
+from typing import Dict, Optional
 from fastapi import HTTPException, status
 
 
@@ -77,3 +78,23 @@ class DatabaseException(ScipherBaseException):
             detail=f"Database error: {detail}",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+class ServiceUnavailableException(ScipherBaseException):
+    """Raised while a dependency is still starting up"""
+    def __init__(self, detail: str, retry_after: int = 30):
+        super().__init__(
+            detail=f"Service unavailable: {detail}",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.headers = {"Retry-After": str(retry_after)}
+
+
+class NotModifiedException(ScipherBaseException):
+    """Raised to short-circuit a conditional GET whose ETag still matches"""
+    def __init__(self, etag: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(
+            detail="Not modified",
+            status_code=status.HTTP_304_NOT_MODIFIED
+        )
+        self.headers = {**(headers or {}), "ETag": etag}
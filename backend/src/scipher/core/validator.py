@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Set
+from typing import Optional, Set
 import re
 from fastapi import UploadFile
 
@@ -12,6 +12,14 @@ from scipher.core.exceptions import (
 )
 from scipher.models.schemas import ProcessingStatus
 
+# Anything other than word characters, whitespace, hyphens and dots
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\s\-\.]')
+
+# Slack allowed for multipart framing (boundaries, part headers) in the Content-Length
+# pre-check only. Bodies up to MAX_FILE_SIZE + this pass validate_content_length; the
+# enforced limit on the file itself is still MAX_FILE_SIZE, via validate_file_size.
+_CONTENT_LENGTH_MULTIPART_ALLOWANCE = 64 * 1024
+
 
 class DocumentValidator:
     """Handles all validation logic for documents and files"""
@@ -61,9 +69,12 @@ class DocumentValidator:
             FileSizeExceededException: If file too large
             ValidationException: If file is empty
         """
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to start
+        # Starlette records the size while parsing the multipart body; only seek when it didn't
+        file_size = file.size
+        if file_size is None:
+            file.file.seek(0, 2)  # Seek to end
+            file_size = file.file.tell()
+            file.file.seek(0)  # Reset to start
         
         if file_size == 0:
             raise ValidationException("Empty file uploaded")
@@ -73,6 +84,24 @@ class DocumentValidator:
         
         return file_size
     
+    def validate_content_length(self, content_length: Optional[str]):
+        """
+        Reject oversized uploads from the Content-Length header before the body is read
+        
+        Args:
+            content_length: Raw Content-Length header value, if sent
+            
+        Raises:
+            FileSizeExceededException: If the request body is too large to hold an allowed file
+        """
+        if not content_length or not content_length.isdigit():
+            return
+        
+        body_size = int(content_length)
+        # A coarse pre-check: the exact file limit is applied later by validate_file_size
+        if body_size > self.max_file_size + _CONTENT_LENGTH_MULTIPART_ALLOWANCE:
+            raise FileSizeExceededException(body_size, self.max_file_size)
+    
     def validate_document_status(self, status: str, required_status: str = None):
         """
         Validate document processing status
@@ -101,12 +130,15 @@ class DocumentValidator:
         filename = Path(filename).name
         
         # Remove dangerous characters
-        filename = re.sub(r'[^\w\s\-\.]', '', filename)
+        filename = _UNSAFE_FILENAME_CHARS.sub('', filename)
         
-        # Limit length
+        # Limit length, keeping the extension when there is one
         if len(filename) > 255:
-            name, ext = filename.rsplit('.', 1)
-            filename = name[:250] + '.' + ext
+            if '.' in filename:
+                name, ext = filename.rsplit('.', 1)
+                filename = name[:250] + '.' + ext
+            else:
+                filename = filename[:255]
         
         return filename
     
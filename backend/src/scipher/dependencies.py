@@ -1,16 +1,21 @@
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from scipher.models.database import async_session
 from scipher.core.document_processor import document_processor, DocumentProcessor
 from scipher.core.validator import validator, DocumentValidator
 from scipher.utils.file_utils import file_manager, FileManager
+from scipher.utils.cache import response_cache, ResponseCache
 from scipher.core.summarizer import document_summarizer, DocumentSummarizer
+from scipher.core.exceptions import ServiceUnavailableException
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as db:
         yield db
 
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    return async_session
+
 def get_document_processor() -> DocumentProcessor:
     return document_processor
 
@@ -21,4 +26,10 @@ def get_file_manager() -> FileManager:
     return file_manager
 
 def get_summarizer() -> DocumentSummarizer:
+    # Turn summary requests away rather than queue them behind a model load in progress
+    if document_summarizer.is_warming_up:
+        raise ServiceUnavailableException("summarization model is still loading")
     return document_summarizer
+
+def get_response_cache() -> ResponseCache:
+    return response_cache
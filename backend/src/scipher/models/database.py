@@ -1,48 +1,128 @@
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, relationship, Mapped, mapped_column
-from sqlalchemy import String, DateTime, ForeignKey, Text, BigInteger, Integer
-from sqlalchemy.dialects.postgresql import UUID
-from datetime import datetime
-from zoneinfo import ZoneInfo
+from sqlalchemy import String, DateTime, ForeignKey, Text, BigInteger, Integer, JSON, text, Index, CheckConstraint, inspect
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime, timezone
 import uuid
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
+import asyncio
+import logging
+import orjson
 
 from scipher.config import settings
 from scipher.models.schemas import ProcessingStatus
 
+logger = logging.getLogger(__name__)
+
 class Base(DeclarativeBase):
     pass
 
-async_engine = create_async_engine(settings.DATABASE_URL, echo=settings.DB_ECHO)
+# Server-side prepared statements are an asyncpg feature; other drivers get no extra connect args
+_connect_args = (
+    {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+    if settings.DATABASE_URL.startswith("postgresql+asyncpg")
+    else {}
+)
+
+# AsyncAdaptedQueuePool is the async engine's pool; a sync Session engine would need plain QueuePool
+async_engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    insertmanyvalues_page_size=settings.DB_INSERTMANYVALUES_PAGE_SIZE,
+    connect_args=_connect_args,
+    # JSON columns on drivers without native decoding (SQLite) go through orjson instead of stdlib json
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads
+)
 async_session = async_sessionmaker(async_engine, expire_on_commit=False)
 
+def _create_missing_indexes(sync_conn):
+    """
+    create_all skips tables that already exist, so add any indexes introduced since
+    
+    CHECK constraints can't be added the same way (SQLite has no ALTER TABLE ADD
+    CONSTRAINT), so tables that predate one are only reported, with the statement
+    to run by hand on databases that support it.
+    """
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                logger.info("Creating missing index %s on %s", index.name, table.name)
+                index.create(sync_conn)
+        
+        existing = {constraint["name"] for constraint in inspector.get_check_constraints(table.name)}
+        for constraint in table.constraints:
+            if isinstance(constraint, CheckConstraint) and constraint.name not in existing:
+                logger.warning(
+                    "Table %s predates check constraint %s, which is not enforced until added manually: "
+                    "ALTER TABLE %s ADD CONSTRAINT %s CHECK (%s)",
+                    table.name, constraint.name, table.name, constraint.name, constraint.sqltext
+                )
+
 async def init_db():
     """Initialize database tables asynchronously"""
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
+
+async def warm_pool(connections: int = None):
+    """Open pooled connections up front so the first requests don't pay connect latency"""
+    count = min(connections or settings.DB_POOL_WARMUP, settings.db_pool_size)
+    
+    async def ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    await asyncio.gather(*(ping() for _ in range(count)))
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Serves list_documents' status filter + upload_date ordering without a sort
+        Index("ix_documents_status_upload_date", "status", text("upload_date DESC")),
+        CheckConstraint(
+            "status IN (" + ", ".join(f"'{s.value}'" for s in ProcessingStatus) + ")",
+            name="ck_documents_status"
+        ),
+    )
     
     id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
     filename: Mapped[str] = mapped_column(String, nullable=False)  # Added for sanitized filename
     original_filename: Mapped[str] = mapped_column(String, nullable=False)
     file_path: Mapped[str] = mapped_column(String, nullable=False)
-    upload_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(ZoneInfo("UTC")))
+    upload_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     file_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
     status: Mapped[str] = mapped_column(String, default=ProcessingStatus.UPLOADED.value)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     extracted_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    metadata_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Was Text holding json.dumps output. create_all doesn't alter existing tables, so older databases keep
+    # a text column: values still round-trip through the engine's orjson (de)serializers as JSON text
+    # (orjson rejects the NaN/Infinity stdlib json allowed; metadata never holds floats). On PostgreSQL,
+    # converting is a manual step:
+    #   ALTER TABLE documents ALTER COLUMN metadata_json TYPE jsonb USING metadata_json::jsonb;
+    metadata_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     
-    sections: Mapped[List["Section"]] = relationship(back_populates="document", cascade="all, delete-orphan")
-    jobs: Mapped[List["ProcessingJob"]] = relationship(back_populates="document", cascade="all, delete-orphan")
+    sections: Mapped[List["Section"]] = relationship(back_populates="document", cascade="all, delete-orphan", passive_deletes=True, order_by="Section.order")
+    jobs: Mapped[List["ProcessingJob"]] = relationship(back_populates="document", cascade="all, delete-orphan", passive_deletes=True)
 
 class Section(Base):
     __tablename__ = "sections"
+    __table_args__ = (
+        # Serves get_document_sections' section_type filter already in display order
+        Index("ix_sections_doc_type_order", "document_id", "section_type", "order"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    document_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("documents.id"), nullable=False)
+    document_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     section_type: Mapped[str] = mapped_column(String, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     order: Mapped[int] = mapped_column(Integer, default=0)
@@ -51,9 +131,13 @@ class Section(Base):
 
 class ProcessingJob(Base):
     __tablename__ = "processing_jobs"
+    __table_args__ = (
+        # Serves job lookups and the bulk delete by document, narrowed by status
+        Index("ix_processing_jobs_document_status", "document_id", "status"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    document_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("documents.id"), nullable=False)
+    document_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     job_type: Mapped[str] = mapped_column(String, nullable=False)
     status: Mapped[str] = mapped_column(String, nullable=False)
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from enum import Enum
@@ -31,14 +31,13 @@ class DeleteResponse(BaseModel):
     id: UUID
 
 class SectionSchema(BaseModel):
-    id: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
+    id: Optional[int] = None  # always sent; null for sections parsed on read, which have no row
     document_id: UUID
     section_type: str
     content: str
     order: int = 0
-    
-    class Config:
-        from_attributes = True
 
 class ProcessingJobSchema(BaseModel):
     id: int
@@ -53,6 +52,8 @@ class ProcessingJobSchema(BaseModel):
         from_attributes = True
 
 class ProcessedContent(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
     id: UUID
     filename: str  # Sanitized filename
     original_filename: str  # Original filename
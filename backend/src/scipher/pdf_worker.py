@@ -0,0 +1,41 @@
+"""
+PDF conversion run inside the DocumentProcessor process pool
+
+Kept free of app imports: spawned workers import this module to unpickle the
+task, and must not pull in the database engine, summarizer or torch.
+"""
+from typing import Optional, Tuple
+import threading
+
+from docling.document_converter import DocumentConverter
+
+# Docling converter loads ML models, so it's built lazily once per process
+_CONVERTER_LOCK = threading.Lock()
+_CONVERTER: Optional[DocumentConverter] = None
+
+
+def _get_converter() -> DocumentConverter:
+    """Return the process-wide Docling converter, creating it on first use"""
+    global _CONVERTER
+    if _CONVERTER is None:
+        with _CONVERTER_LOCK:
+            if _CONVERTER is None:
+                _CONVERTER = DocumentConverter()
+    return _CONVERTER
+
+
+def convert_and_export(file_path: str) -> Tuple[str, int]:
+    """
+    Convert a PDF in a worker process
+
+    Only the markdown and page count are returned so the Docling document
+    never has to be pickled back to the parent.
+
+    Args:
+        file_path: Path to PDF file
+
+    Returns:
+        Tuple of (markdown text, page count)
+    """
+    result = _get_converter().convert(file_path)
+    return result.document.export_to_markdown(), result.document.num_pages()
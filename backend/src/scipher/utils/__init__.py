@@ -1,10 +1,14 @@
 """Utility functions package"""
-from .file_utils import file_manager, FileManager
+from .file_utils import file_manager, FileManager, FileInfo
 from .response_utils import response_formatter, ResponseFormatter
+from .cache import response_cache, ResponseCache
 
 __all__ = [
     "file_manager",
     "FileManager",
+    "FileInfo",
     "response_formatter",
-    "ResponseFormatter"
+    "ResponseFormatter",
+    "response_cache",
+    "ResponseCache"
 ]
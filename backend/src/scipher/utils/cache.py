@@ -0,0 +1,106 @@
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from scipher.config import settings
+
+
+class ResponseCache:
+    """
+    In-process TTL cache for read-only document responses, invalidated per document
+
+    Each web worker has its own cache and invalidate() only reaches the worker that
+    calls it, so callers must revalidate a hit against the database (the routes
+    compare the document's ETag columns) before serving it.
+    """
+
+    def __init__(self, ttl: float = None, max_documents: int = None, max_bytes: int = None):
+        self.ttl = ttl if ttl is not None else settings.RESPONSE_CACHE_TTL
+        self.max_documents = max_documents or settings.RESPONSE_CACHE_MAX_DOCUMENTS
+        self.max_bytes = max_bytes or settings.RESPONSE_CACHE_MAX_BYTES
+        # doc_id -> {key: (expires_at, value, nbytes)}, least recently used document first;
+        # processing runs in worker threads, hence the lock
+        self._entries: Dict[str, Dict[Hashable, Tuple[float, Any, int]]] = {}
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get(self, doc_id: str, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value for a document
+
+        Args:
+            doc_id: Document ID
+            key: Response key within the document
+
+        Returns:
+            Cached value or None if missing/expired
+        """
+        with self._lock:
+            doc_entries = self._entries.get(doc_id)
+            if doc_entries is None:
+                return None
+            entry = doc_entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < monotonic():
+                del doc_entries[key]
+                self._bytes -= entry[2]
+                return None
+            # Move the document to the most recently used end
+            self._entries[doc_id] = self._entries.pop(doc_id)
+            return entry[1]
+
+    def set(self, doc_id: str, key: Hashable, value: Any, nbytes: int = 0) -> None:
+        """
+        Cache a value for a document
+
+        Args:
+            doc_id: Document ID
+            key: Response key within the document
+            value: Value to cache
+            nbytes: Approximate size of the value, counted against max_bytes
+        """
+        if self.ttl <= 0 or nbytes > self.max_bytes:
+            return
+        with self._lock:
+            doc_entries = self._entries.pop(doc_id, None)
+            if doc_entries is None:
+                doc_entries = {}
+            else:
+                previous = doc_entries.get(key)
+                if previous is not None:
+                    self._bytes -= previous[2]
+            # Evict least recently used documents until the new entry fits
+            while self._entries and (
+                len(self._entries) >= self.max_documents or self._bytes + nbytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+            doc_entries[key] = (monotonic() + self.ttl, value, nbytes)
+            self._entries[doc_id] = doc_entries
+            self._bytes += nbytes
+
+    def invalidate(self, doc_id: str) -> None:
+        """
+        Drop every cached response for a document
+
+        Args:
+            doc_id: Document ID
+        """
+        with self._lock:
+            self._drop(doc_id)
+
+    def clear(self) -> None:
+        """Drop all cached responses"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, doc_id: str) -> None:
+        """Remove a document's entries; caller holds the lock"""
+        doc_entries = self._entries.pop(doc_id, None)
+        if doc_entries:
+            self._bytes -= sum(entry[2] for entry in doc_entries.values())
+
+
+# Singleton instance
+response_cache = ResponseCache()
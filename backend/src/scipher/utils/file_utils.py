@@ -1,27 +1,155 @@
 from pathlib import Path
-import shutil
-import uuid
-from typing import Optional
+import asyncio
+import errno
+import io
+import mmap
+import os
+import tempfile
+from shutil import copyfileobj, move as _shutil_move
+from uuid import uuid4
+from typing import Iterable, List, NamedTuple, Optional
 from fastapi import UploadFile
 
 from scipher.config import settings
 from scipher.core.exceptions import FileOperationException
 
 
+class FileInfo(NamedTuple):
+    """Subset of a stat result callers need, gathered in one syscall"""
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+# Files at least this large are memory-mapped by read_file_mapped
+_MMAP_MIN_SIZE = 1024 * 1024
+
+
+def _disk_fileno(fileobj) -> Optional[int]:
+    """
+    File descriptor backing an upload, if it is already on disk
+    
+    Args:
+        fileobj: File object behind an UploadFile
+        
+    Returns:
+        Descriptor or None for in-memory spooled files and other non-fd streams
+    """
+    # fileno() on a SpooledTemporaryFile forces a rollover to disk, so only ask once it has rolled
+    if _spooled_buffer(fileobj) is not None:
+        return None
+    try:
+        return fileobj.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def _spooled_buffer(fileobj) -> Optional[io.BytesIO]:
+    """
+    In-memory buffer behind an upload that has not rolled over to disk
+    
+    Relies on CPython's private SpooledTemporaryFile attributes (_rolled, _file);
+    this is the only place that reads them, and anything unexpected falls back
+    to the regular copy path.
+    
+    Args:
+        fileobj: File object behind an UploadFile
+        
+    Returns:
+        The spool's BytesIO, or None once rolled over or for other streams
+    """
+    if isinstance(fileobj, tempfile.SpooledTemporaryFile) and not getattr(fileobj, "_rolled", True):
+        buffer = getattr(fileobj, "_file", None)
+        if isinstance(buffer, io.BytesIO):
+            return buffer
+    return None
+
+
+def _fadvise(fd: int, advice: str) -> None:
+    """
+    Best-effort posix_fadvise over a whole file
+    
+    Args:
+        fd: File descriptor
+        advice: Name of the os.POSIX_FADV_* constant
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+    except OSError:
+        # Hints only; some filesystems and pipes reject them
+        pass
+
+
+def _sendfile_all(src_fd: int, dst_fd: int) -> bool:
+    """
+    Copy a whole file between descriptors with os.sendfile
+    
+    Args:
+        src_fd: Source descriptor, positioned at the start
+        dst_fd: Destination descriptor
+        
+    Returns:
+        True if copied, False if sendfile is unsupported for these descriptors
+    """
+    if not hasattr(os, "sendfile"):
+        return False
+    offset = 0
+    try:
+        while sent := os.sendfile(dst_fd, src_fd, offset, 1 << 30):
+            offset += sent
+    except OSError as e:
+        if offset == 0 and e.errno in (errno.EINVAL, errno.ENOTSUP, errno.ENOSYS):
+            return False
+        raise
+    return True
+
+
+def _copyfileobj_readinto(fsrc, fdst, bufsize: int) -> None:
+    """
+    Copy a file object through one reused buffer instead of a new bytes per chunk
+    
+    Args:
+        fsrc: Source file object
+        fdst: Destination file object
+        bufsize: Buffer size in bytes
+    """
+    fsrc_readinto = getattr(fsrc, "readinto", None)
+    if fsrc_readinto is None:
+        copyfileobj(fsrc, fdst, bufsize)
+        return
+    
+    fdst_write = fdst.write
+    buf = bytearray(bufsize)
+    mv = memoryview(buf)
+    while n := fsrc_readinto(buf):
+        fdst_write(mv[:n])
+
+
 class FileManager:
     """Handles all file system operations"""
     
     def __init__(self, upload_dir: Path = None):
-        self.upload_dir = upload_dir or settings.UPLOAD_DIR
+        # Resolved once so every path built from it is already absolute
+        self.upload_dir = (upload_dir or settings.UPLOAD_DIR).resolve()
+        # Directories known to exist, so repeated moves skip the mkdir syscall
+        self._ensured_dirs: set[Path] = set()
         self.ensure_upload_directory()
     
     def ensure_upload_directory(self):
         """Create upload directory if it doesn't exist"""
         try:
-            self.upload_dir.mkdir(parents=True, exist_ok=True)
-        except Exception as e:
+            self._ensure_dir(self.upload_dir)
+        except OSError as e:
             raise FileOperationException("directory creation", str(e))
     
+    def _ensure_dir(self, directory: Path):
+        """Create a directory once per FileManager"""
+        if directory not in self._ensured_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(directory)
+    
     def generate_unique_filename(self, original_filename: str) -> tuple:
         """
         Generate unique filename while preserving extension
@@ -32,7 +160,7 @@ class FileManager:
         Returns:
             Tuple of (unique_id, safe_filename)
         """
-        doc_id = str(uuid.uuid4())
+        doc_id = str(uuid4())
         file_ext = Path(original_filename).suffix.lower()
         safe_filename = f"{doc_id}{file_ext}"
         return doc_id, safe_filename
@@ -58,14 +186,34 @@ class FileManager:
         file_path = self.upload_dir / filename
         
         try:
+            file.file.seek(0)
+            spooled = _spooled_buffer(file.file)
             with file_path.open("wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+                if spooled is not None:
+                    # Small uploads still sit in memory; write them out in one call without copying
+                    with spooled.getbuffer() as view:
+                        buffer.write(view)
+                    return file_path
+                
+                # Uploads spooled to disk are copied in-kernel; everything else goes through Python
+                src_fd = _disk_fileno(file.file)
+                if src_fd is None:
+                    _copyfileobj_readinto(file.file, buffer, settings.UPLOAD_CHUNK_SIZE)
+                else:
+                    # One-shot read of the spool file: readahead aggressively, then drop it from the page cache
+                    _fadvise(src_fd, "POSIX_FADV_SEQUENTIAL")
+                    try:
+                        if not _sendfile_all(src_fd, buffer.fileno()):
+                            _copyfileobj_readinto(file.file, buffer, settings.UPLOAD_CHUNK_SIZE)
+                    finally:
+                        _fadvise(src_fd, "POSIX_FADV_DONTNEED")
             return file_path
-        except Exception as e:
-            # Cleanup partial file
-            if file_path.exists():
-                file_path.unlink()
-            raise FileOperationException("save", str(e))
+        except BaseException as e:
+            # Cleanup partial file, but only wrap I/O errors
+            file_path.unlink(missing_ok=True)
+            if isinstance(e, OSError):
+                raise FileOperationException("save", str(e))
+            raise
     
     def delete_file(self, file_path: str | Path) -> bool:
         """
@@ -81,12 +229,11 @@ class FileManager:
             FileOperationException: If deletion fails
         """
         try:
-            path = Path(file_path)
-            if path.exists():
-                path.unlink()
-                return True
+            os.unlink(file_path)
+            return True
+        except FileNotFoundError:
             return False
-        except Exception as e:
+        except OSError as e:
             raise FileOperationException("delete", str(e))
     
     def get_file_size(self, file_path: str | Path) -> int:
@@ -99,15 +246,31 @@ class FileManager:
         Returns:
             File size in bytes
             
+        Raises:
+            FileOperationException: If file doesn't exist
+        """
+        return self.get_file_info(file_path).size
+    
+    def get_file_info(self, file_path: str | Path) -> FileInfo:
+        """
+        Get size, modification time and inode from a single stat
+        
+        Args:
+            file_path: Path to file
+            
+        Returns:
+            FileInfo tuple
+            
         Raises:
             FileOperationException: If file doesn't exist
         """
         try:
-            return Path(file_path).stat().st_size
+            st = os.stat(file_path)
         except FileNotFoundError:
             raise FileOperationException("stat", "File not found")
-        except Exception as e:
+        except OSError as e:
             raise FileOperationException("stat", str(e))
+        return FileInfo(st.st_size, st.st_mtime_ns, st.st_ino)
     
     def read_file(self, file_path: str | Path) -> bytes:
         """
@@ -124,7 +287,34 @@ class FileManager:
         """
         try:
             return Path(file_path).read_bytes()
-        except Exception as e:
+        except OSError as e:
+            raise FileOperationException("read", str(e))
+    
+    def read_file_mapped(self, file_path: str | Path) -> bytes | mmap.mmap:
+        """
+        Read file contents, memory-mapping large files instead of copying them
+        
+        Args:
+            file_path: Path to file
+            
+        Returns:
+            Bytes for small files, a read-only mmap (bytes-like, close when done) for large ones
+            
+        Raises:
+            FileOperationException: If read fails
+        """
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                size = os.fstat(fd).st_size
+                if size < _MMAP_MIN_SIZE:
+                    return os.read(fd, size) if size else b""
+                # Pages are faulted in on access and shared with the page cache; start readahead now
+                _fadvise(fd, "POSIX_FADV_WILLNEED")
+                return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            finally:
+                os.close(fd)
+        except OSError as e:
             raise FileOperationException("read", str(e))
     
     def move_file(self, source: Path, destination: Path) -> Path:
@@ -142,11 +332,48 @@ class FileManager:
             FileOperationException: If move fails
         """
         try:
-            destination.parent.mkdir(parents=True, exist_ok=True)
-            shutil.move(str(source), str(destination))
+            self._ensure_dir(destination.parent)
+            # A same-filesystem move is a metadata-only rename; shutil.move copies across devices
+            try:
+                os.replace(source, destination)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                _shutil_move(str(source), str(destination))
             return destination
-        except Exception as e:
+        except OSError as e:
             raise FileOperationException("move", str(e))
+    
+    async def delete_file_async(self, file_path: str | Path) -> bool:
+        """Delete a file from a worker thread; see delete_file"""
+        return await asyncio.to_thread(self.delete_file, file_path)
+    
+    async def delete_many(self, file_paths: Iterable[str | Path]) -> List[bool]:
+        """
+        Delete several files concurrently on the default thread pool
+        
+        Args:
+            file_paths: Paths to delete
+            
+        Returns:
+            Per-path results, True if deleted, False if the file didn't exist
+            
+        Raises:
+            FileOperationException: If any deletion fails
+        """
+        return list(await asyncio.gather(*(self.delete_file_async(path) for path in file_paths)))
+    
+    async def get_file_size_async(self, file_path: str | Path) -> int:
+        """Get file size from a worker thread; see get_file_size"""
+        return await asyncio.to_thread(self.get_file_size, file_path)
+    
+    async def read_file_async(self, file_path: str | Path) -> bytes:
+        """Read file contents from a worker thread; see read_file"""
+        return await asyncio.to_thread(self.read_file, file_path)
+    
+    async def move_file_async(self, source: Path, destination: Path) -> Path:
+        """Move a file from a worker thread; see move_file"""
+        return await asyncio.to_thread(self.move_file, source, destination)
 
 
 # Singleton instance
@@ -1,7 +1,17 @@
-from typing import Any, Dict, List, Optional
-from fastapi.responses import JSONResponse
+from os import stat_result as StatResult
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+from fastapi.responses import FileResponse, ORJSONResponse
+from types import MappingProxyType
 from scipher.models.schemas import ProcessingStatus
 
+# Built once at import; ProcessingStatus is a str enum, so plain status strings match too
+_STATUS_MESSAGES = MappingProxyType({
+    ProcessingStatus.UPLOADED: "Document uploaded successfully, queued for processing",
+    ProcessingStatus.PROCESSING: "Document is being processed",
+    ProcessingStatus.COMPLETED: "Processing completed successfully",
+    ProcessingStatus.FAILED: "Processing failed"
+})
 
 class ResponseFormatter:
     """Standardized API response formatting"""
@@ -11,7 +21,7 @@ class ResponseFormatter:
         data: Any,
         message: str = "Success",
         status_code: int = 200
-    ) -> JSONResponse:
+    ) -> ORJSONResponse:
         """
         Format successful response
         
@@ -23,7 +33,7 @@ class ResponseFormatter:
         Returns:
             Formatted JSON response
         """
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status_code,
             content={
                 "success": True,
@@ -37,7 +47,7 @@ class ResponseFormatter:
         error: str,
         detail: str,
         status_code: int = 400
-    ) -> JSONResponse:
+    ) -> ORJSONResponse:
         """
         Format error response
         
@@ -49,7 +59,7 @@ class ResponseFormatter:
         Returns:
             Formatted JSON error response
         """
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status_code,
             content={
                 "success": False,
@@ -58,6 +68,38 @@ class ResponseFormatter:
             }
         )
     
+    @staticmethod
+    def file_response(
+        path: str | Path,
+        filename: str,
+        media_type: Optional[str] = None,
+        stat_result: Optional[StatResult] = None,
+        headers: Optional[Mapping[str, str]] = None
+    ) -> FileResponse:
+        """
+        Format file download response
+        
+        Streams the file straight from disk (sendfile where the transport
+        supports it) instead of reading it into memory and wrapping it in JSON.
+        
+        Args:
+            path: File path on disk
+            filename: Download filename
+            media_type: Content type, guessed from filename if omitted
+            stat_result: Existing stat of the file, saves a second stat
+            headers: Extra response headers
+            
+        Returns:
+            Streaming file response
+        """
+        return FileResponse(
+            path=path,
+            filename=filename,
+            media_type=media_type,
+            stat_result=stat_result,
+            headers=headers
+        )
+    
     @staticmethod
     def pagination_response(
         items: List[Any],
@@ -85,6 +127,33 @@ class ResponseFormatter:
             "has_more": (skip + limit) < total
         }
     
+    @staticmethod
+    def pagination_response_cursor(
+        items: List[Any],
+        next_cursor: Optional[str],
+        limit: int
+    ) -> Dict[str, Any]:
+        """
+        Format cursor-paginated response
+        
+        Carries no total, so callers can skip the COUNT query entirely;
+        use pagination_response when a total is actually needed.
+        
+        Args:
+            items: List of items
+            next_cursor: Cursor for the next page, None on the last page
+            limit: Page size
+            
+        Returns:
+            Pagination metadata with items
+        """
+        return {
+            "items": items,
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        }
+    
     @staticmethod
     def status_message_mapper(status: str) -> str:
         """
@@ -96,13 +165,7 @@ class ResponseFormatter:
         Returns:
             Human-readable status message
         """
-        messages = {
-            ProcessingStatus.UPLOADED: "Document uploaded successfully, queued for processing",
-            ProcessingStatus.PROCESSING: "Document is being processed",
-            ProcessingStatus.COMPLETED: "Processing completed successfully",
-            ProcessingStatus.FAILED: "Processing failed"
-        }
-        return messages.get(status, "Unknown status")
+        return _STATUS_MESSAGES.get(status, "Unknown status")
 
 
 # Singleton instance
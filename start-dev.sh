@@ -67,7 +67,7 @@ start_backend() {
     fi
 
     echo "🚀 Starting backend server at http://localhost:8080"
-    PYTHONPATH=src uvicorn main:app --reload --host 0.0.0.0 --port 8080 &
+    PYTHONPATH=src uvicorn main:app --reload --host 0.0.0.0 --port 8080 --loop uvloop --http httptools &
     BACKEND_PID=$!
     cd ..
     echo "✅ Backend started (PID: $BACKEND_PID)"